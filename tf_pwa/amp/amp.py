@@ -222,7 +222,7 @@ class CachedAmpAmplitudeModel(BaseAmplitudeModel):
             a = tf.reshape(i, [-1, i.shape[1]] + [1] * (len(j[0].shape) - 1))
             ret.append(tf.reduce_sum(a * tf.stack(j, axis=1), axis=1))
         # print(ret)
-        amp = tf.reduce_sum(ret, axis=0)
+        amp = tf.add_n(ret)
         return self.decay_group.sum_with_polarization(amp)
 
 
@@ -284,7 +284,7 @@ class CachedShapeAmplitudeModel(BaseAmplitudeModel):
             ret.append(tf.reduce_sum(a * j, axis=1))
 
         # print(ret)
-        amp = tf.reduce_sum(ret, axis=0)
+        amp = tf.add_n(ret)
         return self.decay_group.sum_with_polarization(amp)
 
 
@@ -344,7 +344,7 @@ class FactorAmplitudeModel(BaseAmplitudeModel):
 
     def pdf(self, data):
         ret = self.get_amp_list(data)
-        amp = tf.reduce_sum(ret, axis=0)
+        amp = tf.add_n(ret)
         return self.decay_group.sum_with_polarization(amp)
 
 
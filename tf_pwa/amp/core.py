@@ -877,6 +877,19 @@ class HelicityDecay(AmpDecay):
                     )
         return ret
 
+    def get_cg_trans(self, dtype):
+        """:meth:`get_cg_matrix` as a (n_ls, n_b, n_c) tensor of dtype"""
+        return self._get_cg_trans(self.get_ls_list(), tf.as_dtype(dtype))
+
+    @functools.lru_cache()
+    def _get_cg_trans(self, ls, dtype):
+        cg = np.reshape(
+            self._get_cg_matrix(ls),
+            (len(ls), len(self.outs[0].spins), len(self.outs[1].spins)),
+        )
+        with tf.init_scope():  # cached, so never a tensor of a traced graph
+            return tf.constant(cg, dtype=dtype)
+
     def build_ls2hel_eq(self):
         cg_matrix = self.get_cg_matrix(out_sym=True)
         gls = []
@@ -908,13 +921,14 @@ class HelicityDecay(AmpDecay):
 
     def get_helicity_amp(self, data, data_p, **kwargs):
         m_dep = self.get_ls_amp(data, data_p, **kwargs)
-        cg_trans = tf.cast(self.get_cg_matrix(), m_dep.dtype)
+        cg_trans = self.get_cg_trans(m_dep.dtype)
         n_ls = len(self.get_ls_list())
-        m_dep = tf.reshape(m_dep, (-1, n_ls, 1, 1))
-        cg_trans = tf.reshape(
-            cg_trans, (n_ls, len(self.outs[0].spins), len(self.outs[1].spins))
+        # sum over all (l, s) channels as one matmul
+        m_dep = tf.reshape(m_dep, (-1, n_ls))
+        H = tf.matmul(m_dep, tf.reshape(cg_trans, (n_ls, -1)))
+        H = tf.reshape(
+            H, (-1, len(self.outs[0].spins), len(self.outs[1].spins))
         )
-        H = tf.reduce_sum(m_dep * cg_trans, axis=1)
         # print(n_ls, cg_trans, self, m_dep.shape) # )data_p)
         if self.allow_cc:
             all_data = kwargs.get("all_data", {})
@@ -930,13 +944,14 @@ class HelicityDecay(AmpDecay):
 
     def get_angle_helicity_amp(self, data, data_p, **kwargs):
         m_dep = self.get_angle_ls_amp(data, data_p, **kwargs)
-        cg_trans = tf.cast(self.get_cg_matrix(), m_dep.dtype)
+        cg_trans = self.get_cg_trans(m_dep.dtype)
         n_ls = len(self.get_ls_list())
-        m_dep = tf.reshape(m_dep, (-1, n_ls, 1, 1))
-        cg_trans = tf.reshape(
-            cg_trans, (n_ls, len(self.outs[0].spins), len(self.outs[1].spins))
+        # sum over all (l, s) channels as one matmul
+        m_dep = tf.reshape(m_dep, (-1, n_ls))
+        H = tf.matmul(m_dep, tf.reshape(cg_trans, (n_ls, -1)))
+        H = tf.reshape(
+            H, (-1, len(self.outs[0].spins), len(self.outs[1].spins))
         )
-        H = tf.reduce_sum(m_dep * cg_trans, axis=1)
         # print(n_ls, cg_trans, self, m_dep.shape) # )data_p)
         if self.allow_cc:
             all_data = kwargs.get("all_data", {})
@@ -952,12 +967,9 @@ class HelicityDecay(AmpDecay):
 
     def get_factor_H(self, data, data_p, **kwargs):  # -> (n, n_ls, h1, h2)
         m_dep = self.get_angle_ls_amp(data, data_p, **kwargs)  # (n,l)
-        cg_trans = tf.cast(self.get_cg_matrix(), m_dep.dtype)
+        cg_trans = self.get_cg_trans(m_dep.dtype)
         n_ls = len(self.get_ls_list())
         m_dep = tf.reshape(m_dep, (-1, n_ls, 1, 1))
-        cg_trans = tf.reshape(
-            cg_trans, (n_ls, len(self.outs[0].spins), len(self.outs[1].spins))
-        )
         # H = tf.reduce_sum(m_dep * cg_trans, axis=1)
         H = m_dep * cg_trans  # (n, n_ls, h1, h2)
         return H
@@ -1109,16 +1121,12 @@ class HelicityDecay(AmpDecay):
                     dt = get_D_matrix_lambda(
                         ang, particle.J, particle.spins, particle.spins
                     )
-                    dt_shape = [-1, 1, 1, 1, 1]
-                    dt_shape[j + 2] = len(particle.spins)
-                    dt_shape[j + 3] = len(particle.spins)
-                    dt = tf.reshape(dt, dt_shape)
-                    D_shape = [-1, len(a.spins), len(b.spins), len(c.spins)]
-                    D_shape.insert(j + 3, 2)
-                    D_shape[j + 3] = 1
-                    ret = tf.reshape(ret, D_shape)
-                    ret = dt * ret
-                    ret = tf.reduce_sum(ret, axis=j + 2)
+                    # sum over the helicity of particle j as a batched matmul
+                    dt = tf.expand_dims(dt, axis=1)
+                    if j == 0:
+                        ret = tf.matmul(dt, ret, transpose_a=True)
+                    else:
+                        ret = tf.matmul(ret, dt)
         return ret
 
     def get_angle_amp(self, data, data_p, **kwargs):
@@ -1144,16 +1152,12 @@ class HelicityDecay(AmpDecay):
                     dt = get_D_matrix_lambda(
                         ang, particle.J, particle.spins, particle.spins
                     )
-                    dt_shape = [-1, 1, 1, 1, 1]
-                    dt_shape[j + 2] = len(particle.spins)
-                    dt_shape[j + 3] = len(particle.spins)
-                    dt = tf.reshape(dt, dt_shape)
-                    D_shape = [-1, len(a.spins), len(b.spins), len(c.spins)]
-                    D_shape.insert(j + 3, 2)
-                    D_shape[j + 3] = 1
-                    ret = tf.reshape(ret, D_shape)
-                    ret = dt * ret
-                    ret = tf.reduce_sum(ret, axis=j + 2)
+                    # sum over the helicity of particle j as a batched matmul
+                    dt = tf.expand_dims(dt, axis=1)
+                    if j == 0:
+                        ret = tf.matmul(dt, ret, transpose_a=True)
+                    else:
+                        ret = tf.matmul(ret, dt)
         return ret
 
     def get_factor_angle_amp(self, data, data_p, **kwargs):
@@ -1626,7 +1630,7 @@ class DecayGroup(BaseDecayGroup, AmpBase):
                 )
                 ret.append(amp)
                 # print(decay_chain, amp[:10])
-        ret = tf.reduce_sum(ret, axis=0)
+        ret = tf.add_n(ret)
         return ret
 
     def get_m_dep(self, data):
@@ -1,3 +1,7 @@
+import numpy as np
+
+from tf_pwa.breit_wigner import Bprime_q2
+from tf_pwa.config import get_config
 from tf_pwa.tensorflow_wrapper import tf
 
 from .core import Particle, Variable, register_particle
@@ -8,10 +12,9 @@ def cal_monentum(m, ma, mb):
     mabm = ma - mb
     s = m * m
     p2 = (s - mabp * mabp) * (s - mabm * mabm) / 4 / s
-    zeros = tf.zeros_like(s)
-    p_p = tf.complex(tf.sqrt(tf.abs(p2)), zeros)
-    p_m = tf.complex(zeros, tf.sqrt(tf.abs(p2)))
-    return tf.where(p2 > 0, p_p, p_m)
+    q = tf.sqrt(tf.abs(p2))
+    pos = tf.cast(p2 > 0, q.dtype)
+    return tf.complex(q * pos, q * (1 - pos))
 
 
 def cal_monentum_sympy(m, ma, mb):
@@ -53,9 +56,13 @@ class ParticleFlatte(Particle):
 
 Required input arguments `mass_list: [[m11, m12], [m21, m22]]` for :math:`m_{i,1}, m_{i,2}`.
 
+  `jit_compile=True` to compile the amplitude with XLA.
+
     """
 
-    def __init__(self, *args, mass_list=None, im_sign=1, **kwargs):
+    def __init__(
+        self, *args, mass_list=None, im_sign=1, jit_compile=False, **kwargs
+    ):
         super().__init__(*args, **kwargs)
         if mass_list is None:
             raise ValueError("required mass_list: [[a, b], [mc, md]]")
@@ -63,6 +70,8 @@ Required input arguments `mass_list: [[m11, m12], [m21, m22]]` for :math:`m_{i,1
         self.g_value = []
         self.float_list = list(kwargs.get("float", []))
         self.im_sign = im_sign
+        self.jit_compile = jit_compile
+        self._jit_amp = None
 
     def init_params(self):
         self.d = 3.0
@@ -107,20 +116,34 @@ Required input arguments `mass_list: [[m11, m12], [m21, m22]]` for :math:`m_{i,1
         w = tf.math.imag(1 / amp)
         return w
 
+    def get_channel_mass(self, dtype):
+        """masses of final particles in all channels, shape (2, n_channel)"""
+        return tf.unstack(tf.cast(np.transpose(self.mass_list), dtype))
+
     def get_amp(self, *args, **kwargs):
         m = args[0]["m"]
+        if self.jit_compile:
+            dtype = get_config("dtype")
+            if self._jit_amp is None:
+                self._jit_amp = tf.function(
+                    self.flatte_amp,
+                    jit_compile=True,
+                    input_signature=[tf.TensorSpec(None, dtype)],
+                )
+            return self._jit_amp(tf.cast(m, dtype))
+        return self.flatte_amp(m)
+
+    def flatte_amp(self, m):
         mass = self.get_mass()
-        zeros = tf.zeros_like(m)
         delta_s = mass * mass - m * m
         m_c = mass / m
-        rhos = []
-        for i, mab in enumerate(self.mass_list):
-            ma, mb = mab
-            pi = cal_monentum(m, ma, mb)
-            # print(pi)
-            m_rho_i = pi * tf.complex(zeros, self.g_value[i]() * m_c)
-            rhos.append(m_rho_i)
-        rho = self.im_sign * sum(rhos)
+        # all channels are calculated at once along the last axis
+        ma, mb = self.get_channel_mass(delta_s.dtype)
+        gi = tf.stack([i() for i in self.g_value])
+        pi = cal_monentum(tf.expand_dims(m, -1), ma, mb)
+        g_m = gi * tf.expand_dims(m_c, -1)
+        m_rho = pi * tf.complex(tf.zeros_like(g_m), g_m)
+        rho = self.im_sign * tf.reduce_sum(m_rho, axis=-1)
         re = delta_s + tf.math.real(rho)
         im = tf.math.imag(rho)
         d = re * re + im * im
@@ -272,46 +295,45 @@ The plot use parameters :math:`m_0=0.7, m_{0,1}=m_{0,2}=0.1, m_{1,1}=m_{1,2}=0.3
         gi = self.get_coeff()
         return (mass, *gi)
 
-    def get_amp(self, *args, **kwargs):
-        m = args[0]["m"]
+    def flatte_amp(self, m):
         mass = self.get_mass()
-        zeros = tf.zeros_like(m)
         delta_s = mass * mass - m * m
         if self.no_m0:
             m_c = 1 / m
         else:
             m_c = mass / m
-        rhos = []
-        gi = self.get_coeff()
-        for i, (mab, l) in enumerate(zip(self.mass_list, self.l_list)):
-            ma, mb = mab
-            pi = cal_monentum(m, ma, mb)
-            pi0 = cal_monentum(mass, ma, mb)
-            m_rho_i = pi * tf.complex(zeros, gi[i] * m_c)
-            if self.no_q0:
-                pi0 = tf.ones_like(pi0)
-            else:
-                m_rho_i = m_rho_i * tf.complex(
-                    mass / tf.abs(pi0), tf.zeros_like(mass)
-                )
-            if l != 0:
-                m_rho_i = m_rho_i * tf.complex(
-                    tf.abs(pi / pi0) ** (2 * l), zeros
-                )
-            if self.has_bprime:
-                from tf_pwa.breit_wigner import Bprime_q2
-
-                bf = (
-                    Bprime_q2(l, tf.abs(pi) ** 2, tf.abs(pi0) ** 2, self.d)
-                    ** 2
-                )
-                m_rho_i = m_rho_i * tf.complex(bf, zeros)
-            if self.cut_phsp:
-                m_rho_i = tf.where(
-                    m < ma + mb, tf.zeros_like(m_rho_i), m_rho_i
+        # all channels are calculated at once along the last axis
+        ma, mb = self.get_channel_mass(delta_s.dtype)
+        gi = tf.stack(self.get_coeff())
+        m = tf.expand_dims(m, -1)
+        pi = cal_monentum(m, ma, mb)
+        pi0 = cal_monentum(mass, ma, mb)
+        factor = gi * tf.expand_dims(m_c, -1)
+        if self.no_q0:
+            pi0 = tf.ones_like(pi0)
+        else:
+            factor = factor * mass / tf.abs(pi0)
+        l_list = np.array(self.l_list)
+        if np.any(l_list != 0):
+            has_l = l_list != 0
+            q_ratio = tf.where(has_l, tf.abs(pi / pi0), tf.ones_like(factor))
+            factor = factor * q_ratio ** tf.cast(2 * l_list, factor.dtype)
+        if self.has_bprime and np.any(l_list != 0):
+            # B_0' is always 1
+            bf = []
+            for i, l in enumerate(self.l_list):
+                if l == 0:
+                    bf.append(tf.ones_like(factor[..., i]))
+                    continue
+                bf_i = Bprime_q2(
+                    l, tf.abs(pi[..., i]) ** 2, tf.abs(pi0[i]) ** 2, self.d
                 )
-            rhos.append(m_rho_i)
-        rho = self.im_sign * sum(rhos)
+                bf.append(bf_i**2)
+            factor = factor * tf.stack(bf, axis=-1)
+        m_rho = pi * tf.complex(tf.zeros_like(factor), factor)
+        if self.cut_phsp:
+            m_rho = tf.where(m < ma + mb, tf.zeros_like(m_rho), m_rho)
+        rho = self.im_sign * tf.reduce_sum(m_rho, axis=-1)
         re = delta_s + tf.math.real(rho)
         im = tf.math.imag(rho)
         d = re * re + im * im
@@ -350,8 +372,7 @@ The plot use parameters :math:`m_0=0.7, m_{0,1}=m_{0,2}=0.1, m_{1,1}=m_{1,2}=0.3
                     l, abs(pi0 * self.d) ** 2
                 ) / Bprime_polynomial(l, abs(pi * self.d) ** 2)
                 m_rho_i = m_rho_i * bf
-            if self.cut_phsp:
-                m_rho_i * sym.Heaviside(m - ma - mb)
+            # cut_phsp is not applied, the poles need the analytic form
             rhos.append(m_rho_i)
         rho = self.im_sign * sum(rhos)
         re = delta_s + rho
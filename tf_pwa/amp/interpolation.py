@@ -152,7 +152,7 @@ class Interp(InterpolationParticle):
             add_f(m, self.points[i], self.points[i + 1], p[i], p[i + 1])
             for i in range(self.interp_N - 1)
         ]
-        return tf.complex(tf.reduce_sum(ret, axis=0), zeros)
+        return tf.complex(tf.add_n(ret), zeros)
 
 
 @register_particle("interp_c")
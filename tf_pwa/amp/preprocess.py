@@ -64,6 +64,7 @@ class BasePreProcessor(HeavyCall):
             "random_z",
             "align_ref",
             "only_left_angle",
+            "use_tf_function",
         ]:
             if k in self.kwargs:
                 kwargs[k] = self.kwargs[k]
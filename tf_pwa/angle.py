@@ -1,11 +1,28 @@
 """
 This module implements three classes **Vector3**, **LorentzVector**, **EulerAngle** .
 """
+import functools
+
 from .tensorflow_wrapper import numpy_cross, tf
 
 _epsilon = 1.0e-14
 
 
+@functools.lru_cache()
+def _lorentz_metric(dtype):
+    with tf.init_scope():  # keep it eager when first called in a tf.function
+        return tf.constant([1.0, -1.0, -1.0, -1.0], dtype=dtype)
+
+
+def _boost_gamma2(beta2, gamma):
+    """:math:`(\\gamma-1)/\\beta^2`, zero for :math:`\\beta^2<\\epsilon`.
+    The denominator is masked too, so that the unused branch does not bring
+    NaN into the gradient of a particle at rest."""
+    mask = beta2 > _epsilon
+    safe_beta2 = tf.where(mask, beta2, tf.ones_like(beta2))
+    return tf.where(mask, (gamma - 1.0) / safe_beta2, tf.zeros_like(beta2))
+
+
 # import functools
 # from pysnooper import snoop
 
@@ -154,11 +171,11 @@ class LorentzVector(tf.Tensor):
         beta2 = Vector3.norm2(pb)
         gamma = 1.0 / tf.sqrt(1 - beta2)
         bp = Vector3.dot(pb, LorentzVector.vect(self))
-        gamma2 = tf.where(beta2 > _epsilon, (gamma - 1.0) / beta2, 0.0)
+        gamma2 = _boost_gamma2(beta2, gamma)
+        T = LorentzVector.get_T(self)
         p_r = LorentzVector.vect(self)
-        p_r += tf.expand_dims(gamma2 * bp, axis=-1) * pb
-        p_r += tf.expand_dims(gamma * LorentzVector.get_T(self), axis=-1) * pb
-        T_r = tf.expand_dims(gamma * (LorentzVector.get_T(self) + bp), axis=-1)
+        p_r += tf.expand_dims(gamma2 * bp + gamma * T, axis=-1) * pb
+        T_r = tf.expand_dims(gamma * (T + bp), axis=-1)
         ret = tf.concat([T_r, p_r], -1)
         return ret
 
@@ -166,7 +183,7 @@ class LorentzVector(tf.Tensor):
         pb = LorentzVector.boost_vector(self)
         beta2 = Vector3.norm2(pb)
         gamma = 1.0 / tf.sqrt(1 - beta2)
-        gamma2 = tf.where(beta2 > _epsilon, (gamma - 1.0) / beta2, 0.0)
+        gamma2 = _boost_gamma2(beta2, gamma)
 
         # bp = pb_i v_i
         # p_r_i = v_i
@@ -180,19 +197,13 @@ class LorentzVector(tf.Tensor):
         # [ x ] = [ gamma pb_x  |  1 + gamma2 pb_x pb_x  |    gamma2 pb_x pb_y   |    gamma2 pb_x pb_z ]
         # [ y ] = [ gamma pb_y  |      gamma2 pb_y pb_x  |  1+gamma2 pb_y pb_y   |    gamma2 pb_y pb_z ]
         # [ z ] = [ gamma pb_z  |      gamma2 pb_z pb_x  |    gamma2 pb_z pb_y   |  1+gamma2 pb_z pb_z ]
-        ret00 = gamma
-        ret0x = tf.expand_dims(gamma, axis=-1) * pb
-        retx0 = tf.expand_dims(gamma, axis=-1) * pb
+        g_pb = tf.expand_dims(gamma, axis=-1) * pb
         retxx = tf.eye(3, dtype=pb.dtype) + tf.expand_dims(
             tf.expand_dims(gamma2, axis=-1) * pb, axis=-1
         ) * tf.expand_dims(pb, axis=-2)
-
-        ret0 = tf.concat([tf.expand_dims(gamma, axis=-1), ret0x], axis=-1)
-        # print(ret0)
-        retx = tf.concat([tf.expand_dims(retx0, axis=-2), retxx], axis=-2)
-        # print(retx)
-        ret = tf.concat([tf.expand_dims(ret0, axis=-1), retx], axis=-1)
-        # print(ret)
+        ret0 = tf.concat([tf.expand_dims(gamma, axis=-1), g_pb], axis=-1)
+        retx = tf.concat([tf.expand_dims(g_pb, axis=-1), retxx], axis=-1)
+        ret = tf.concat([tf.expand_dims(ret0, axis=-2), retx], axis=-2)
         return ret
 
     def gamma(self):
@@ -216,14 +227,17 @@ class LorentzVector(tf.Tensor):
         """
         The metric is (1,-1,-1,-1) by default
         """
-        return tf.cast(tf.constant([1.0, -1.0, -1.0, -1.0]), self.dtype)
+        return _lorentz_metric(tf.as_dtype(self.dtype))
 
     def M2(self):
         """
         The invariant mass squared
         """
-        s = self * self * LorentzVector.get_metric(self)
-        return tf.reduce_sum(s, axis=-1)
+        s = self * self
+        metric = LorentzVector.get_metric(self)
+        if (tf.TensorShape(s.shape).rank or 0) < 2:
+            return tf.reduce_sum(s * metric, axis=-1)
+        return tf.linalg.matvec(s, metric)
 
     def M(self):
         """
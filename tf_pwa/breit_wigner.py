@@ -8,8 +8,6 @@ import functools
 import math
 import warnings
 
-import sympy as sym
-
 from .tensorflow_wrapper import tf
 
 breit_wigner_dict = {}
@@ -311,10 +309,7 @@ def barrier_factor(l, q, q0, d=3.0, axis=0):  # cache q^l * B_l 只用于H里
     Barrier factor multiplied with :math:`q^L`, which is used as a combination in the amplitude expressions. The values
     are cached for :math:`L` ranging from 0 to **l**.
     """
-    ret = []
-    for i in l:
-        tmp = q**i * tf.cast(Bprime(i, q, q0, d), q.dtype)
-        ret.append(tmp)
+    ret = _barrier_factor_list(l, q, q0, d)
     return tf.stack(ret)
 
 
@@ -322,11 +317,23 @@ def barrier_factor2(l, q, q0, d=3.0, axis=-1):  # cache q^l * B_l 只用于H里
     """
     ???
     """
+    ret = _barrier_factor_list(l, q, q0, d)
+    ret = [tf.reshape(i, (-1, 1)) for i in ret]
+    return tf.concat(ret, axis=axis)
+
+
+def _barrier_factor_list(l, q, q0, d):
+    """:math:`q^L B_L'(q,q_0,d)` for L in l, the same as `Bprime`, with
+    :math:`(qd)^2` and :math:`(q_0d)^2` calculated once for all L."""
+    z = (q * d) ** 2
+    z0 = (q0 * d) ** 2
     ret = []
     for i in l:
-        tmp = q**i * tf.cast(Bprime(i, q, q0, d), q.dtype)
-        ret.append(tf.reshape(tmp, (-1, 1)))
-    return tf.concat(ret, axis=axis)
+        num = tf.sqrt(Bprime_polynomial(i, z0))
+        denom = tf.sqrt(Bprime_polynomial(i, z))
+        bp = tf.cast(num, denom.dtype) / denom
+        ret.append(q**i * tf.cast(bp, q.dtype))
+    return ret
 
 
 def Bprime_polynomial(l, z):
@@ -337,24 +344,25 @@ def Bprime_polynomial(l, z):
     :param z: The variable in the polynomial
     :return: The calculated value
     """
-    coeff = {
-        0: [1.0],
-        1: [1.0, 1.0],
-        2: [1.0, 3.0, 9.0],
-        3: [1.0, 6.0, 45.0, 225.0],
-        4: [1.0, 10.0, 135.0, 1575.0, 11025.0],
-        5: [1.0, 15.0, 315.0, 6300.0, 99225.0, 893025.0],
-    }
     l = int(l + 0.01)
-    if l not in coeff:
-        coeff[l] = [float(i) for i in get_bprime_coeff(l)]
-        # raise NotImplementedError
+    if l not in _bprime_coeff:
+        _bprime_coeff[l] = [float(i) for i in get_bprime_coeff(l)]
     z = tf.convert_to_tensor(z)
-    cof = [tf.convert_to_tensor(i, z.dtype) for i in coeff[l]]
+    cof = [tf.convert_to_tensor(i, z.dtype) for i in _bprime_coeff[l]]
     ret = tf.math.polyval(cof, z)
     return ret
 
 
+_bprime_coeff = {
+    0: [1.0],
+    1: [1.0, 1.0],
+    2: [1.0, 3.0, 9.0],
+    3: [1.0, 6.0, 45.0, 225.0],
+    4: [1.0, 10.0, 135.0, 1575.0, 11025.0],
+    5: [1.0, 15.0, 315.0, 6300.0, 99225.0, 893025.0],
+}
+
+
 def reverse_bessel_polynomials(n, x):
     """Reverse Bessel polynomials.
 
@@ -379,12 +387,28 @@ def get_bprime_coeff(l):
     .. math::
         |\\theta_{l}(jw)|^2 = \\sum_{i=0}^{l} c_i w^{2 i}
 
+    With :math:`\\theta_{l}(x)=\\sum_{k} a_k x^{l-k}`, only the real terms remain
+
+    .. math::
+        c_{l-i} = \\sum_{k+k'=2i} (-1)^{(k'-k)/2} a_k a_{k'}
+
+    >>> get_bprime_coeff(2)
+    [1, 3, 9]
+
     """
-    x = sym.Symbol("x")
-    theta = reverse_bessel_polynomials(l, x)
-    w = sym.Symbol("w", real=True)
-    Hjw = theta.subs({"x": sym.I * w})
-    Hjw2 = sym.Poly(Hjw * Hjw.conjugate(), w)
-    coeffs = Hjw2.as_dict()
-    ret = [coeffs.get((2 * l - 2 * i,), 0) for i in range(l + 1)]
+    a = [
+        fractions.Fraction(
+            math.factorial(l + k),
+            math.factorial(l - k) * math.factorial(k) * 2**k,
+        )
+        for k in range(l + 1)
+    ]
+    ret = []
+    for i in range(l + 1):
+        c = 0
+        for k in range(max(0, 2 * i - l), i + 1):
+            k2 = 2 * i - k
+            sign = 1 if (k2 - k) % 4 == 0 else -1
+            c += (1 if k == k2 else 2) * sign * a[k] * a[k2]
+        ret.append(int(c) if c.denominator == 1 else c)
     return ret
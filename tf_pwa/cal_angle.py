@@ -49,7 +49,9 @@ The full data structure provided is ::
 Inner nodes are named as tuple of particles.
 
 """
+import functools
 import itertools
+from collections import deque
 
 import numpy as np
 
@@ -59,6 +61,7 @@ from .data import (
     HeavyCall,
     LazyCall,
     data_index,
+    data_map,
     data_merge,
     data_shape,
     data_strip,
@@ -142,10 +145,7 @@ def struct_momentum(p, center_mass=True) -> dict:
     """
     ret = {}
     if center_mass:
-        ps_top = []
-        for i in p:
-            ps_top.append(p[i])
-        p_top = tf.reduce_sum(ps_top, 0)
+        p_top = tf.add_n(list(p.values()))
         for i in p:
             ret[i] = {"p": LorentzVector.rest_vector(p_top, p[i])}
     else:
@@ -164,10 +164,7 @@ def infer_momentum(data, decay_chain: DecayChain) -> dict:
     for i in st:
         if i in data:
             continue
-        ps = []
-        for j in st[i]:
-            ps.append(data[j]["p"])
-        data[i] = {"p": tf.reduce_sum(ps, 0)}
+        data[i] = {"p": tf.add_n([data[j]["p"] for j in st[i]])}
     return data
 
 
@@ -194,6 +191,15 @@ def add_weight(data: dict, weight: float = 1.0) -> dict:
     return data
 
 
+def _rest_vectors(p_rest, ps):
+    """
+    boost a list of momenta into the rest frame of p_rest,
+    all of them are stacked as (n, batch, 4) and boosted at once.
+    """
+    ret = LorentzVector.rest_vector(p_rest, tf.stack(ps))
+    return tf.unstack(ret)
+
+
 def cal_chain_boost(data, decay_chain: DecayChain) -> dict:
     """
     calculate chain boost for a decay chain
@@ -201,45 +207,20 @@ def cal_chain_boost(data, decay_chain: DecayChain) -> dict:
     part_data = {}
     core_decay_map = {}
 
-    decay_set = list(decay_chain)
     particle_set = set(decay_chain.inner) | set(decay_chain.outs)
-    while len(decay_set) > 0:
-        tmp_decay_set = []
-        for i in decay_set:
-            if i.core == decay_chain.top:
-                part_data[i] = {}
-                p_rest = data[i.core]["p"]
-                part_data[i]["rest_p"] = {}
-                for j in i.outs:
-                    core_decay_map[j] = i
-                    pj = data[j]["p"]
-                    p = LorentzVector.rest_vector(p_rest, pj)
-                    part_data[i]["rest_p"][j] = p
-                    particle_set.remove(j)
-                for j in particle_set:
-                    pj = data[j]["p"]
-                    p = LorentzVector.rest_vector(p_rest, pj)
-                    part_data[i]["rest_p"][j] = p
-            elif i.core in core_decay_map:
-                part_data[i] = {}
-                p_rest = part_data[core_decay_map[i.core]]["rest_p"][i.core]
-                part_data[i]["rest_p"] = {}
-                for j in i.outs:
-                    core_decay_map[j] = i
-                    pj = part_data[core_decay_map[i.core]]["rest_p"][j]
-                    p = LorentzVector.rest_vector(p_rest, pj)
-                    part_data[i]["rest_p"][j] = p
-                    particle_set.remove(j)
-                for j in particle_set:
-                    pj = part_data[core_decay_map[i.core]]["rest_p"][j]
-                    p = LorentzVector.rest_vector(p_rest, pj)
-                    part_data[i]["rest_p"][j] = p
-            else:
-                tmp_decay_set.append(i)
-        decay_set = tmp_decay_set
-    # from pprint import pprint
-    # pprint(part_data)
-    # exit()
+    for i in decay_chain.topo_order():
+        if i.core == decay_chain.top:
+            p_rest = data[i.core]["p"]
+            p_frame = {j: data[j]["p"] for j in particle_set}
+        else:
+            p_frame = part_data[core_decay_map[i.core]]["rest_p"]
+            p_rest = p_frame[i.core]
+        for j in i.outs:
+            core_decay_map[j] = i
+            particle_set.remove(j)
+        particles = list(i.outs) + list(particle_set)
+        p = _rest_vectors(p_rest, [p_frame[j] for j in particles])
+        part_data[i] = {"rest_p": dict(zip(particles, p))}
     return part_data
 
 
@@ -282,67 +263,130 @@ def cal_helicity_angle(
     set_z = {decay_chain.top: base_z}
     r_matrix = {}
     b_matrix = {}
-    set_decay = list(decay_chain)
-    while set_decay:
-        extra_decay = []
-        for i in set_decay:
-            if i.core in set_x:
-                ret[i] = {}
-                bias = -np.pi
-                for j in i.outs:
-                    ret[i][j] = {}
-                    p_rest = part_data[i]["rest_p"][j]
-                    z2 = LorentzVector.vect(p_rest)
-                    ang, x = EulerAngle.angle_zx_z_getx(
-                        set_z[i.core], set_x[i.core], z2
-                    )
-                    set_x[j] = x
-                    set_z[j] = z2
-                    # set range to make sure opposite allow be - phi
-                    ang["alpha"] = (ang["alpha"] - bias) % (2 * np.pi) + bias
-                    bias -= np.pi
-                    ret[i][j]["ang"] = ang
-                    ret[i][j]["x"] = x
-                    ret[i][j]["z"] = z2
-                    Bp = SU2M.Boost_z_from_p(p_rest)
-                    b_matrix[j] = Bp
-                    r = SU2M.Rotation_y(ang["beta"]) * SU2M.Rotation_z(
-                        ang["alpha"]
-                    )
-                    if i.core in r_matrix:
-                        r_matrix[j] = r * b_matrix[i.core] * r_matrix[i.core]
-                    else:
-                        r_matrix[j] = r
-                if len(i.outs) == 3:
-                    # Euler Angle for
-                    p_rest = [part_data[i]["rest_p"][j] for j in i.outs]
-                    zi = [LorentzVector.vect(i) for i in p_rest]
-                    ret[i]["ang"], xi = EulerAngle.angle_zx_zzz_getx(
-                        set_z[i.core], set_x[i.core], zi
-                    )
-                    for j, x, z, p_rest_i in zip(i.outs, xi, zi, p_rest):
-                        ret[i][j] = {}
-                        ret[i][j]["x"] = x
-                        ret[i][j]["z"] = z
-                        Bp = SU2M.Boost_z_from_p(p_rest_i)
-                        b_matrix[j] = Bp
-                        r = SU2M.Rotation_y(ang["beta"]) * SU2M.Rotation_z(
-                            ang["alpha"]
-                        )
-                        if i.core in r_matrix:
-                            r_matrix[j] = (
-                                r * b_matrix[i.core] * r_matrix[i.core]
-                            )
-                        else:
-                            r_matrix[j] = r
-            else:
-                extra_decay.append(i)
-        set_decay = extra_decay
+    for i in decay_chain.topo_order():
+        ret[i] = {}
+        # all outs of a decay are stacked in a new first axis
+        n_outs = len(i.outs)
+        p_rest = tf.stack([part_data[i]["rest_p"][j] for j in i.outs])
+        z2 = LorentzVector.vect(p_rest)
+        ang, x = EulerAngle.angle_zx_z_getx(set_z[i.core], set_x[i.core], z2)
+        # set range to make sure opposite allow be - phi
+        bias = -np.pi * np.arange(1, n_outs + 1)
+        bias = np.reshape(bias, (-1,) + (1,) * (len(ang["alpha"].shape) - 1))
+        ang["alpha"] = (ang["alpha"] - bias) % (2 * np.pi) + bias
+        Bp = SU2M.Boost_z_from_p(p_rest)
+        outs_struct = {"ang": ang, "x": x, "z": z2, "b": Bp}
+        if n_outs == 3:
+            # the same rotation (from the angle of the last out) for all outs
+            r_ang = {k: ang[k][-1] for k in ["alpha", "beta"]}
+        else:
+            r_ang = ang
+        r = SU2M.Rotation_y(r_ang["beta"]) * SU2M.Rotation_z(r_ang["alpha"])
+        if i.core in r_matrix:
+            r = r * b_matrix[i.core] * r_matrix[i.core]
+        if n_outs != 3:
+            outs_struct["r"] = r
+        outs_data = _unstack_struct(outs_struct, [{}] * n_outs)
+        for j, data_j in zip(i.outs, outs_data):
+            set_x[j] = data_j["x"]
+            set_z[j] = data_j["z"]
+            ret[i][j] = {k: data_j[k] for k in ["ang", "x", "z"]}
+            b_matrix[j] = data_j["b"]
+            r_matrix[j] = data_j.get("r", r)
+        if n_outs == 3:
+            # Euler Angle for the plane of three outs
+            zi = [ret[i][j]["z"] for j in i.outs]
+            ret[i]["ang"], xi = EulerAngle.angle_zx_zzz_getx(
+                set_z[i.core], set_x[i.core], zi
+            )
+            for j, x, z in zip(i.outs, xi, zi):
+                ret[i][j] = {"x": x, "z": z}
     ret["r_matrix"] = r_matrix
     ret["b_matrix"] = b_matrix
     return ret
 
 
+def _chain_shape(decay_chain):
+    """
+    shape of a decay chain and its particles in a canonical order,
+    chains of the same shape only differ in particles.
+    """
+    particles = [decay_chain.top]
+    shape = []
+    for dec in decay_chain.topo_order():
+        shape.append((particles.index(dec.core), len(dec.outs)))
+        particles.extend(dec.outs)
+    return tuple(shape), particles
+
+
+def _unstack_struct(x, name_maps):
+    """
+    unstack the first axis of all tensors in a nested structure,
+    and rename keys with each of name_maps.
+    """
+    if isinstance(x, SU2M):
+        return [SU2M(i) for i in _unstack_struct(x["x"], name_maps)]
+    if isinstance(x, dict):
+        ret = [type(x)() for _ in name_maps]
+        for k, v in x.items():
+            for r, m, v_i in zip(
+                ret, name_maps, _unstack_struct(v, name_maps)
+            ):
+                r[m.get(k, k)] = v_i
+        return ret
+    if isinstance(x, list):
+        return [
+            list(i) for i in zip(*[_unstack_struct(i, name_maps) for i in x])
+        ]
+    return tf.unstack(x, num=len(name_maps))
+
+
+def cal_helicity_angle_chains(
+    data: dict,
+    decay_chains,
+    base_z=np.array([0.0, 0.0, 1.0]),
+    base_x=np.array([1.0, 0.0, 0.0]),
+) -> dict:
+    """
+    :func:`cal_helicity_angle` for a list of decay chains.
+    Chains of the same shape (such as :math:`A\\rightarrow R_1 D, R_1\\rightarrow BC` and
+    :math:`A\\rightarrow R_2 C, R_2 \\rightarrow BD`) are stacked in a new first axis and
+    calculated at once.
+
+    :return: `{decay_chain: cal_helicity_angle(data, decay_chain)}`
+    """
+    groups = {}
+    for chain in decay_chains:
+        shape, particles = _chain_shape(chain)
+        groups.setdefault(shape, []).append((chain, particles))
+    ret = {}
+    for group in groups.values():
+        if len(group) == 1:
+            chain = group[0][0]
+            ret[chain] = cal_helicity_angle(data, chain, base_z, base_x)
+            continue
+        template, template_particles = group[0]
+        data_stack = {}
+        for k, i in enumerate(template_particles):
+            p = [data[particles[k]]["p"] for _, particles in group]
+            if k == 0 and all(j[1][0] == i for j in group):
+                # the same top particle, the boost to its rest frame is
+                # calculated once and broadcasted to all chains
+                data_stack[i] = {"p": p[0]}
+            else:
+                data_stack[i] = {"p": tf.stack(p)}
+        ret_stack = cal_helicity_angle(data_stack, template, base_z, base_x)
+        name_maps = []
+        for chain, particles in group:
+            name_map = dict(zip(template_particles, particles))
+            name_map.update(zip(template.topo_order(), chain.topo_order()))
+            name_maps.append(name_map)
+        ret_chains = _unstack_struct(ret_stack, name_maps)
+        for (chain, _), ret_i in zip(group, ret_chains):
+            ret[chain] = ret_i
+    return {i: ret[i] for i in decay_chains}
+
+
 def aligned_angle_ref_rule1(decay_group, decay_chain_struct, decay_data):
     # calculate aligned angle of final particles in each decay chain
     set_x = {}  # reference particles
@@ -418,20 +462,20 @@ def cal_angle_from_particle(
         decay_chain_struct = decay_group.topology_structure()
     else:
         decay_chain_struct = decay_group
-    decay_data = {}
 
     # get base z axis
     p4 = data[decay_group.top]["p"]
     p3 = LorentzVector.vect(p4)
-    base_z = np.array([0.0, 0.0, 1.0]) + tf.zeros_like(p3)
+    base_z = tf.constant([0.0, 0.0, 1.0], dtype=p3.dtype)
+    base_x = tf.constant([1.0, 0.0, 0.0], dtype=p3.dtype)
     if random_z:
         p3_norm = Vector3.norm(p3)
         mask = tf.expand_dims(p3_norm < 1e-5, -1)
         base_z = tf.where(mask, base_z, p3)
     # calculate chain angle
-    for i in decay_chain_struct:
-        data_i = cal_helicity_angle(data, i, base_z=base_z)
-        decay_data[i] = data_i
+    decay_data = cal_helicity_angle_chains(
+        data, decay_chain_struct, base_z=base_z, base_x=base_x
+    )
     if align_ref == "center_mass":
         set_x, ref_matrix_final = aligned_angle_ref_rule2(
             decay_group, decay_chain_struct, decay_data
@@ -495,13 +539,21 @@ def Getp(M_0, M_1, M_2):
     :param M_2: The invariant mass of :math:`M_2`
     :return: the momentum of :math:`M_1` (or :math:`M_2`)
     """
+    if all(isinstance(i, (np.ndarray, float, int)) for i in (M_0, M_1, M_2)):
+        # numpy inputs (e.g. mass scan) do not need tensorflow ops
+        return _getp_np(M_0, M_1, M_2)
     M12S = M_1 + M_2
     M12D = M_1 - M_2
     p = (M_0 - M12S) * (M_0 + M12S) * (M_0 - M12D) * (M_0 + M12D)
-    q = (
-        p + tf.abs(p)
-    ) / 2  # if p is negative, which results from bad data, the return value is 0.0
-    return tf.sqrt(q) / (2 * M_0)
+    # if p is negative, which results from bad data, the return value is 0.0
+    return tf.sqrt(tf.nn.relu(p)) / (2 * M_0)
+
+
+def _getp_np(M_0, M_1, M_2):
+    M12S = M_1 + M_2
+    M12D = M_1 - M_2
+    p = (M_0 - M12S) * (M_0 + M12S) * (M_0 - M12D) * (M_0 + M12D)
+    return np.sqrt(np.maximum(p, 0)) / (2 * M_0)
 
 
 def Getp2(M_0, M_1, M_2):
@@ -637,6 +689,7 @@ def cal_angle_from_momentum_base(
     batch=65000,
     align_ref=None,
     only_left_angle=False,
+    use_tf_function=False,
 ) -> CalAngleData:
     """
     Transform 4-momentum data in files for the amplitude model automatically via DecayGroup.
@@ -655,6 +708,7 @@ def cal_angle_from_momentum_base(
             random_z,
             align_ref=align_ref,
             only_left_angle=only_left_angle,
+            use_tf_function=use_tf_function,
         )
     ret = []
     for i in split_generator(p, batch):
@@ -668,6 +722,7 @@ def cal_angle_from_momentum_base(
                 random_z,
                 align_ref=align_ref,
                 only_left_angle=only_left_angle,
+                use_tf_function=use_tf_function,
             )
         )
     return data_merge(*ret)
@@ -718,6 +773,7 @@ def cal_angle_from_momentum_id_swap(
     batch=65000,
     align_ref=None,
     only_left_angle=False,
+    use_tf_function=False,
 ) -> CalAngleData:
     ret = []
     id_particles = decs.identical_particles
@@ -731,6 +787,7 @@ def cal_angle_from_momentum_id_swap(
         batch,
         align_ref=align_ref,
         only_left_angle=only_left_angle,
+        use_tf_function=use_tf_function,
     )
     if id_particles is None or len(id_particles) == 0:
         return data
@@ -747,6 +804,7 @@ def cal_angle_from_momentum_id_swap(
                 batch,
                 align_ref=align_ref,
                 only_left_angle=only_left_angle,
+                use_tf_function=use_tf_function,
             )
         return data
 
@@ -761,12 +819,15 @@ def cal_angle_from_momentum(
     batch=65000,
     align_ref=None,
     only_left_angle=False,
+    use_tf_function=False,
+    dtype=None,
 ) -> CalAngleData:
     """
     Transform 4-momentum data in files for the amplitude model automatically via DecayGroup.
 
     :param p: 4-momentum data
     :param decs: DecayGroup
+    :param dtype: cast momentum to dtype (such as ``"float32"``) before the calculation, all results will be in the same dtype
     :return: Dictionary of data
     """
     if isinstance(p, LazyCall):
@@ -781,7 +842,11 @@ def cal_angle_from_momentum(
             align_ref=align_ref,
             only_left_angle=only_left_angle,
             batch=batch,
+            use_tf_function=use_tf_function,
+            dtype=dtype,
         )
+    if dtype is not None:
+        p = {k: tf.cast(v, dtype) for k, v in p.items()}
     ret = []
     id_particles = decs.identical_particles
     cp_particles = decs.cp_particles
@@ -795,6 +860,7 @@ def cal_angle_from_momentum(
         batch,
         align_ref=align_ref,
         only_left_angle=only_left_angle,
+        use_tf_function=use_tf_function,
     )
     if cp_particles is None or len(cp_particles) == 0:
         return data
@@ -810,6 +876,7 @@ def cal_angle_from_momentum(
             batch,
             align_ref=align_ref,
             only_left_angle=only_left_angle,
+            use_tf_function=use_tf_function,
         )
         return data
 
@@ -823,16 +890,54 @@ def cal_angle_from_momentum_single(
     random_z=True,
     align_ref=None,
     only_left_angle=False,
+    use_tf_function=False,
 ) -> CalAngleData:
     """
     Transform 4-momentum data in files for the amplitude model automatically via DecayGroup.
 
     :param p: 4-momentum data
     :param decs: DecayGroup
+    :param use_tf_function: run the whole calculation as one traced graph, cached for each DecayGroup
     :return: Dictionary of data
     """
     p = {BaseParticle(k) if isinstance(k, str) else k: v for k, v in p.items()}
     p = {i: p[i] for i in decs.outs}
+    if use_tf_function:
+        dtype = getattr(next(iter(p.values())), "dtype", get_config("dtype"))
+        fun = _cal_angle_graph(
+            decs,
+            tf.as_dtype(dtype),
+            using_topology,
+            center_mass,
+            r_boost,
+            random_z,
+            align_ref,
+            only_left_angle,
+        )
+        return CalAngleData(fun(p))
+    data = _cal_angle_impl(
+        p,
+        decs,
+        using_topology,
+        center_mass,
+        r_boost,
+        random_z,
+        align_ref,
+        only_left_angle,
+    )
+    return CalAngleData(data)
+
+
+def _cal_angle_impl(
+    p,
+    decs,
+    using_topology,
+    center_mass,
+    r_boost,
+    random_z,
+    align_ref,
+    only_left_angle,
+):
     data_p = struct_momentum(p, center_mass=center_mass)
     if using_topology:
         decay_chain_struct = decs.topology_structure()
@@ -854,7 +959,42 @@ def cal_angle_from_momentum_single(
     )
     data = {"particle": data_p, "decay": data_d}
     add_relative_momentum(data)
-    return CalAngleData(data)
+    return data
+
+
+@functools.lru_cache(maxsize=16)
+def _cal_angle_graph(decs, dtype, *args):
+    """
+    Build one `tf.function` for the whole angle calculation of `decs`.
+    All python control flow only depends on the DecayGroup, so the nested
+    structure of the result is recorded once when tracing, the graph only
+    returns the flat list of tensors.
+    """
+    outs = list(decs.outs)
+    struct = []
+
+    def _impl(*ps):
+        data = _cal_angle_impl(dict(zip(outs, ps)), decs, *args)
+        leaves = []
+
+        def _leaf(x):
+            leaves.append(x)
+            return len(leaves) - 1
+
+        struct.append(data_map(data, _leaf))
+        return leaves
+
+    graph = tf.function(
+        _impl,
+        input_signature=[tf.TensorSpec([None, 4], dtype)] * len(outs),
+        autograph=False,
+    )
+
+    def _call(p):
+        leaves = graph(*[tf.cast(p[i], dtype) for i in outs])
+        return data_map(struct[-1], lambda idx: leaves[idx])
+
+    return _call
 
 
 def prepare_data_from_dat_file4(fnames):
@@ -890,15 +1030,15 @@ def get_keys(dic, key_path=""):
 
     """
     keys_list = []
-
-    def get_keys(dic, key_path):
+    stack = deque([(dic, key_path)])
+    while stack:
+        dic, key_path = stack.pop()
         if isinstance(dic, dict):
-            for i in dic:
-                get_keys(dic[i], key_path + "/" + str(i))
+            stack.extend(
+                (dic[i], key_path + "/" + str(i)) for i in reversed(list(dic))
+            )
         else:
             keys_list.append(key_path)
-
-    get_keys(dic, key_path)
     return keys_list
 
 
@@ -911,14 +1051,7 @@ def get_key_content(dic, key_path):
 
     """
     keys = key_path.strip("/").split("/")
-
-    def get_content(dic, keys):
-        if len(keys) == 0:
-            return dic
-        for k in dic:
-            if str(k) == keys[0]:
-                ret = get_content(dic[k], keys[1:])
-                break
-        return ret
-
-    return get_content(dic, keys)
+    for key in keys:
+        index = {str(k): k for k in dic}
+        dic = dic[index[key]]
+    return dic
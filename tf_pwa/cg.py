@@ -1,29 +1,86 @@
 """This module provides the function **cg_coef()** to calculate the Clebsch-Gordan coefficients :math:`\\langle
 j_1m_1j_2m_2|JM\\rangle`.
 
-This function has interface to `SymPy <https://www.sympy.org/en/index.html>`_ functions if it's installed correctly.
-Otherwise, it will depend on the input file **tf_pwa/cg_table.json**.
+The coefficients are calculated from the closed form Racah formula (**racah_cg()**), in the same convention as
+`SymPy <https://www.sympy.org/en/index.html>`_. The table in **tf_pwa/cg_table.json** is still provided by **get_cg_coef()**.
 """
 
+import functools
 import json
+import math
 import os
-
-has_sympy = True
-try:
-    from sympy.physics.quantum.cg import CG
-except ImportError:
-    has_sympy = False
+from fractions import Fraction
 
 
+@functools.lru_cache(maxsize=None)
 def cg_coef(jb, jc, mb, mc, ja, ma):
     """
     It returns the CG coefficient :math:`\\langle j_bm_bj_cm_c|j_am_a\\rangle`, as in a decay from particle *a* to *b*
-    and *c*. It will either call **sympy.physics.quantum.cg()** or **get_cg_coef()**.
+    and *c*. It is calculated by the closed form of **racah_cg()** and the results are cached.
+    """
+    return racah_cg(jb, jc, mb, mc, ja, ma)
+
+
+def _double_int(x):
+    ret = int(round(2 * x))
+    if abs(2 * x - ret) > 1e-6:
+        raise ValueError("{} is not a integer or half integer".format(x))
+    return ret
+
+
+def racah_cg(j1, j2, m1, m2, j, m):
+    """
+    The CG coefficient :math:`\\langle j_1m_1j_2m_2|jm\\rangle` from the Racah formula,
+    the same convention as **sympy.physics.quantum.cg()**
+
+    .. math::
+      \\langle j_1m_1j_2m_2|jm\\rangle = \\delta_{m,m_1+m_2}\\sqrt{\\frac{(2j+1)(j+j_1-j_2)!(j-j_1+j_2)!(j_1+j_2-j)!}{(j_1+j_2+j+1)!}}
+      \\sqrt{(j+m)!(j-m)!(j_1-m_1)!(j_1+m_1)!(j_2-m_2)!(j_2+m_2)!}
+      \\sum_k \\frac{(-1)^k}{k!(j_1+j_2-j-k)!(j_1-m_1-k)!(j_2+m_2-k)!(j-j_2+m_1+k)!(j-j_1-m_2+k)!}
+
+    The sum is done with exact integer arithmetic.
+
+    >>> racah_cg(0.5, 0.5, 0.5, -0.5, 1, 0) == 2 ** -0.5
+    True
+
     """
-    if has_sympy:
-        return float(CG(jb, mb, jc, mc, ja, ma).doit().evalf())
-    else:
-        return get_cg_coef(jb, jc, mb, mc, ja, ma)
+    j1, j2, m1, m2, j, m = [_double_int(i) for i in (j1, j2, m1, m2, j, m)]
+    if m1 + m2 != m:
+        return 0.0
+    if (j1 + j2 + j) % 2 != 0 or not abs(j1 - j2) <= j <= j1 + j2:
+        return 0.0
+    if any(
+        abs(mi) > ji or (ji + mi) % 2 != 0
+        for ji, mi in ((j1, m1), (j2, m2), (j, m))
+    ):
+        return 0.0
+    # all values below are integer
+    a = [(j + j1 - j2) // 2, (j - j1 + j2) // 2, (j1 + j2 - j) // 2]
+    b = [(j + m) // 2, (j - m) // 2, (j1 - m1) // 2]
+    b += [(j1 + m1) // 2, (j2 - m2) // 2, (j2 + m2) // 2]
+    f = math.factorial
+    norm2 = Fraction(
+        (j + 1) * f(a[0]) * f(a[1]) * f(a[2]), f((j1 + j2 + j) // 2 + 1)
+    )
+    for i in b:
+        norm2 *= f(i)
+    k_min = max(0, (j2 - j - m1) // 2, (j1 - j + m2) // 2)
+    k_max = min(a[2], b[2], b[5])
+    s = 0
+    for k in range(k_min, k_max + 1):
+        s += Fraction(
+            (-1) ** k,
+            f(k)
+            * f(a[2] - k)
+            * f(b[2] - k)
+            * f(b[5] - k)
+            * f((j - j2 + m1) // 2 + k)
+            * f((j - j1 - m2) // 2 + k),
+        )
+    if s == 0:
+        return 0.0
+    sign = 1.0 if s > 0 else -1.0
+    return sign * math.sqrt(norm2 * s * s)
 
 
 _dirname = os.path.dirname(os.path.abspath(__file__))
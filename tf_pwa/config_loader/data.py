@@ -95,6 +95,7 @@ class SimpleData:
         random_z = self.dic.get("random_z", True)
         align_ref = self.dic.get("align_ref", None)
         only_left_angle = self.dic.get("only_left_angle", False)
+        use_tf_function = self.dic.get("use_tf_function", False)
         preprocessor_model = self.dic.get("preprocessor", "default")
         no_p4 = self.dic.get("no_p4", False)
         no_angle = self.dic.get("no_angle", False)
@@ -105,6 +106,7 @@ class SimpleData:
             random_z=random_z,
             align_ref=align_ref,
             only_left_angle=only_left_angle,
+            use_tf_function=use_tf_function,
             root_config=self.root_config,
             model=preprocessor_model,
             no_p4=no_p4,
@@ -36,7 +36,7 @@ def decay_cut_mass(decay):
         if decay.core.mass is None or any(
             [j.mass is None for j in decay.outs]
         ):
-            True, ""
+            return True, ""
         # print(i, i.core.mass, [j.mass for j in i.outs])
         if decay.core.mass < sum([j.mass for j in decay.outs]):
             return (
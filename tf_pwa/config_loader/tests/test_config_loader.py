@@ -95,3 +95,13 @@ R1_b: {J: 0, P: +1, mass: 2.3, width: 0.03}
             config = ConfigLoader(g)
 
     amp = config.get_amplitude()
+
+
+def test_decay_cut_mass_none():
+    from tf_pwa.amp import get_decay, get_particle
+    from tf_pwa.config_loader.decay_config import decay_cut_mass
+
+    a = get_particle("A", J=0, P=-1)
+    b = get_particle("B", J=0, P=-1, mass=0.5)
+    c = get_particle("C", J=0, P=-1, mass=0.5)
+    assert decay_cut_mass(get_decay(a, [b, c])) == (True, "")
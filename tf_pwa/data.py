@@ -51,6 +51,8 @@ The full data structure is
 
 """
 
+import functools
+import os
 import random
 from pprint import pprint
 
@@ -297,6 +299,22 @@ def set_random_seed(seed):
     random.seed(seed)
 
 
+def _loadtxt(fname, dtype):
+    stat = os.stat(fname)
+    return _loadtxt_cached(
+        os.path.abspath(fname), stat.st_mtime_ns, stat.st_size, np.dtype(dtype)
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _loadtxt_cached(fname, mtime, size, dtype):
+    """parsed text file, cached by file name, modification time and dtype.
+    The array is read only since it is shared by all callers."""
+    data = np.loadtxt(fname, dtype=dtype)
+    data.setflags(write=False)
+    return data
+
+
 def load_dat_file(
     fnames,
     particles,
@@ -336,7 +354,7 @@ def load_dat_file(
         elif fname.endswith(".npy"):
             data = np.load(fname, mmap_mode=mmap_mode)
         else:
-            data = np.loadtxt(fname, dtype=dtype)
+            data = _loadtxt(fname, dtype)
         data = np.reshape(data, (-1, 4))
         sizes.append(data.shape[0])
         datas.append(data)
@@ -351,17 +369,17 @@ def load_dat_file(
     if order is None:
         order = (1, 0, 2)
 
-    ret = {}
-    idx = 0
+    data_all = []
     for size, data in zip(split, datas):
         data_1 = data.reshape((-1, size, 4))
-        data_2 = data_1.transpose(order)
-        for i in data_2:
-            part = particles[idx]
-            ret[part] = i
-            idx += 1
+        data_all.extend(data_1.transpose(order))
 
-    return ret
+    if len(data_all) != n:
+        raise ValueError(
+            "number of particles ({}) does not match the number of data"
+            " blocks ({})".format(n, len(data_all))
+        )
+    return dict(zip(particles, data_all))
 
 
 def save_data(file_name, obj, **kwargs):
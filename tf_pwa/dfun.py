@@ -17,6 +17,7 @@ when :math:`k=\\frac{l+m_2-m_1}{2} \\in [\\max(0,m_2-m_1),\\min(j-m_1,j+m_2)]`,
 
 import functools
 import math
+import weakref
 
 import numpy as np
 
@@ -32,15 +33,10 @@ def _spin_int(x):
 @functools.lru_cache()
 def _tuple_delta_D_trans(j, la, lb, lc):
     ln = _spin_int(2 * j + 1)
-    s = np.zeros(shape=(ln, ln, len(la), len(lb), len(lc)))
-    for i_a, la_i in enumerate(la):
-        for i_b, lb_i in enumerate(lb):
-            for i_c, lc_i in enumerate(lc):
-                delta = lb_i - lc_i
-                if abs(delta) <= j:
-                    idx = la_i + j, delta + j, i_a, i_b, i_c
-                    s[tuple(map(_spin_int, idx))] = 1.0
-    return s
+    idx = _tuple_delta_D_index(j, la, lb, lc)
+    # one-hot rows of the gather index, the extra column is the padding
+    s = np.eye(ln * ln + 1)[idx, :-1]
+    return np.reshape(s.T, (ln, ln, len(la), len(lb), len(lc)))
 
 
 def delta_D_trans(j, la, lb, lc):
@@ -63,17 +59,11 @@ def delta_D_index(j, la, lb, lc):
 @functools.lru_cache()
 def _tuple_delta_D_index(j, la, lb, lc):
     ln = _spin_int(2 * j + 1)
-    ret = []
-    max_idx = ln * ln
-    for i_a, la_i in enumerate(la):
-        for i_b, lb_i in enumerate(lb):
-            for i_c, lc_i in enumerate(lc):
-                delta = lb_i - lc_i
-                if abs(delta) <= j:
-                    ret.append(_spin_int((la_i + j) * ln + delta + j))
-                else:
-                    ret.append(max_idx)
-    return ret
+    la = np.reshape(la, (-1, 1, 1))
+    delta = np.reshape(lb, (-1, 1)) - np.reshape(lc, (-1,))
+    idx = np.floor((la + j) * ln + delta + j + 0.1).astype(np.int64)
+    ret = np.where(np.abs(delta) <= j, idx, ln * ln)
+    return ret.reshape((-1,)).tolist()
 
 
 def Dfun_delta(d, ja, la, lb, lc=(0,)):
@@ -81,18 +71,11 @@ def Dfun_delta(d, ja, la, lb, lc=(0,)):
     The decay from particle *a* to *b* and *c* requires :math:`|l_b-l_c|\\leqslant j`
 
     :math:`D_{ma,mb-mc} = \\delta[(m1,m2)->(ma, mb,mc))] D_{m1,m2}`
-    """
-    t = delta_D_trans(ja, la, lb, lc)
-    ln = _spin_int(2 * ja + 1)
-    t_trans = tf.reshape(t, (ln * ln, len(la) * len(lb) * len(lc)))
-
-    t_cast = tf.cast(t_trans, d.dtype)
-    # print(d[0])
-
-    d = tf.reshape(d, (-1, ln * ln))
 
-    ret = tf.matmul(d, t_cast)
-    return tf.reshape(ret, (-1, len(la), len(lb), len(lc)))
+    The transformation :func:`delta_D_trans` has only one nonzero element for each (ma, mb, mc),
+    so it is done as a gather of the elements (:func:`Dfun_delta_v2`) instead of a dense matmul.
+    """
+    return Dfun_delta_v2(d, ja, la, lb, lc)
 
 
 def Dfun_delta_v2(d, ja, la, lb, lc=(0,)):
@@ -127,22 +110,51 @@ def small_d_weight(j):  # the prefactor in the d-function of β
     """
     ret = np.zeros(shape=(j + 1, j + 1, j + 1))
 
+    # all (2 m_1, 2 m_2, 2 k) at once, with exact integer factorials of x/2
+    m = np.arange(-j, j + 1, 2)
+    m, n, k = np.meshgrid(m, m, np.arange(0, 2 * j + 1, 2), indexing="ij")
+    valid = (k >= n - m) & (k <= j - m) & (k <= j + n)
+    m, n, k = m[valid], n[valid], k[valid]
+
+    fact = np.array([math.factorial(i) for i in range(j + 1)], dtype=object)
+
     def f(x):
-        return math.factorial(x >> 1)
-
-    for m in range(-j, j + 1, 2):
-        for n in range(-j, j + 1, 2):
-            for k in range(max(0, n - m), min(j - m, j + n) + 1, 2):
-                l = (2 * k + (m - n)) // 2
-                sign = (-1) ** ((k + m - n) // 2)
-                tmp = sign * math.sqrt(
-                    1.0 * f(j + m) * f(j - m) * f(j + n) * f(j - n)
-                )
-                tmp /= f(j - m - k) * f(j + n - k) * f(k + m - n) * f(k)
-                ret[l][(m + j) // 2][(n + j) // 2] = tmp
+        return fact[x // 2]
+
+    sign = np.where((k + m - n) // 2 % 2 == 0, 1.0, -1.0)
+    num = 1.0 * f(j + m) * f(j - m) * f(j + n) * f(j - n)
+    den = f(j - m - k) * f(j + n - k) * f(k + m - n) * f(k)
+    l = (2 * k + (m - n)) // 2
+    w = sign * np.sqrt(num.astype(np.float64)) / den
+    ret[l, (m + j) // 2, (n + j) // 2] = w.astype(np.float64)
     return ret
 
 
+@functools.lru_cache()
+def _small_d_weight_matrix(j, dtype):
+    """read only :func:`small_d_weight` as a (j+1, (j+1)*(j+1)) matrix of dtype"""
+    w = np.reshape(small_d_weight(j), (j + 1, (j + 1) * (j + 1)))
+    w = w.astype(dtype)
+    w.setflags(write=False)
+    return w
+
+
+@functools.lru_cache()
+def _spin_table(j, dtype):
+    """
+    constants of dtype for spin j/2, with shape (1, j+1): :math:`m` from
+    :math:`-j/2` to :math:`j/2`, and the powers :math:`l` and :math:`j-l` in
+    :func:`small_d_matrix`
+    """
+    m = np.arange(-j / 2, j / 2 + 1, 1)
+    l = np.arange(0, j + 1)
+    with tf.init_scope():
+        return tuple(
+            tf.constant(np.reshape(i, (1, -1)), dtype=dtype)
+            for i in (m, l, j - l)
+        )
+
+
 def small_d_matrix(theta, j):
     """
     The matrix element of :math:`d^{j}(\\theta)` is
@@ -152,23 +164,17 @@ def small_d_matrix(theta, j):
     :param j: Integer :math:`2j` in the formula???
     :return: The d-matrices array. Same length as theta
     """
-    a = tf.reshape(tf.range(0, j + 1, 1), (1, -1))
-
     half_theta = np.array(0.5) * theta
 
     sintheta = tf.reshape(tf.sin(half_theta), (-1, 1))
     costheta = tf.reshape(tf.cos(half_theta), (-1, 1))
 
-    a = tf.cast(a, dtype=sintheta.dtype)
-    s = tf.pow(sintheta, a)
-    c = tf.pow(costheta, j - a)
+    _, l, j_l = _spin_table(j, sintheta.dtype)
+    s = tf.pow(sintheta, l)
+    c = tf.pow(costheta, j_l)
     sc = s * c
-    w = small_d_weight(j)
-
-    w = tf.cast(w, sc.dtype)
-    w = tf.reshape(w, (j + 1, (j + 1) * (j + 1)))
+    w = _small_d_weight_matrix(j, sc.dtype.as_numpy_dtype)
     ret = tf.matmul(sc, w)
-    # ret = tf.einsum("il,lab->iab", sc, w)
 
     return tf.reshape(ret, (-1, j + 1, j + 1))
 
@@ -184,9 +190,8 @@ def exp_i(theta, mi):
     theta_i = tf.reshape(theta, (-1, 1))
     mi = tf.cast(mi, dtype=theta.dtype)
     m_theta = mi * theta_i
-    zeros = tf.zeros_like(m_theta)
-    im_theta = tf.complex(zeros, m_theta)
-    exp_theta = tf.exp(im_theta)
+    # real cos and sin instead of tf.exp of a complex tensor with zero real part
+    exp_theta = tf.complex(tf.cos(m_theta), tf.sin(m_theta))
     return exp_theta
 
 
@@ -204,14 +209,47 @@ def D_matrix_conj(alpha, beta, gamma, j):
     :param j: Integer :math:`2j` in the formula
     :return: Array of the conjugated D-matrices. Same shape as **alpha**, **beta**, and **gamma**
     """
-    m = tf.reshape(np.arange(-j / 2, j / 2 + 1, 1), (1, -1))
-
     d = small_d_matrix(beta, j)
+    m = _spin_table(j, d.dtype)[0]
     expi_alpha = tf.reshape(exp_i(alpha, m), (-1, j + 1, 1))
     expi_gamma = tf.reshape(exp_i(gamma, m), (-1, 1, j + 1))
     expi_gamma = tf.cast(expi_gamma, dtype=expi_alpha.dtype)
-    dc = tf.complex(d, tf.zeros_like(d))
-    ret = tf.cast(expi_alpha * expi_gamma, dc.dtype) * dc
+    expi = expi_alpha * expi_gamma
+    # d is real, scale the real and imaginary parts instead of a complex product
+    expi_re = tf.cast(tf.math.real(expi), d.dtype)
+    expi_im = tf.cast(tf.math.imag(expi), d.dtype)
+    ret = tf.complex(expi_re * d, expi_im * d)
+    return ret
+
+
+_D_matrix_cache = {}
+
+
+def _cached_D_matrix_conj(alpha, beta, gamma, j):
+    """
+    :func:`D_matrix_conj` cached by the identity of the angle arrays, which are
+    only weak referenced, so an entry is dropped together with its angle data.
+    Only eager values are cached.
+    """
+    angles = (alpha, beta, gamma)
+    key = tuple(id(i) for i in angles) + (j,)
+    item = _D_matrix_cache.get(key)
+    if item is not None and all(r() is i for r, i in zip(item[0], angles)):
+        return item[1]
+    ret = D_matrix_conj(alpha, beta, gamma, j)
+    if not tf.executing_eagerly():
+        return ret
+
+    def _remove(ref):
+        item = _D_matrix_cache.get(key)
+        if item is not None and ref in item[0]:
+            del _D_matrix_cache[key]
+
+    try:
+        refs = tuple(weakref.ref(i, _remove) for i in angles)
+    except TypeError:  # python numbers cannot be weak referenced
+        return ret
+    _D_matrix_cache[key] = (refs, ret)
     return ret
 
 
@@ -221,17 +259,15 @@ def get_D_matrix_for_angle(angle, j, cached=True):
 
     :param angle: Dict of angle data {"alpha","beta","gamma"}
     :param j: Integer :math:`2j` in the formula
-    :param cached: Haven't been used???
+    :param cached: Reuse the D-matrices of the same angle arrays. The cache is
+        kept outside of **angle**, so the angle data is not modified.
     :return: Array of the conjugated D-matrices. Same length as the angle data
     """
     alpha = angle["alpha"]
     beta = angle["beta"]
     gamma = angle["gamma"]
-    name = "D_matrix_{}".format(j)
     if cached:
-        if name not in angle:
-            angle[name] = D_matrix_conj(alpha, beta, gamma, j)
-        return angle[name]
+        return _cached_D_matrix_conj(alpha, beta, gamma, j)
     return D_matrix_conj(alpha, beta, gamma, j)
 
 
@@ -1,3 +1,4 @@
+import functools
 import warnings
 
 from opt_einsum import contract, contract_path, get_symbol
@@ -142,12 +143,18 @@ def remove_size1(expr, *args, extra=None):
     return expr2, ret, size_map
 
 
+@functools.lru_cache(maxsize=256)
+def _contract_path(expr, shapes):
+    """contraction path of `expr` for `shapes`, cached since the same
+    expression is contracted for every call of the amplitude."""
+    path, _ = contract_path(expr, *shapes, shapes=True, optimize="auto")
+    return tuple(path)
+
+
 def einsum(expr, *args, **kwargs):
-    shapes = [replace_none_in_shape(i.shape, 10000) for i in args]
+    shapes = tuple(replace_none_in_shape(i.shape, 10000) for i in args)
     expr, extra = replace_ellipsis(expr, shapes)
-    path, path_info = contract_path(
-        expr, *shapes, shapes=True, optimize="auto"
-    )
+    path = _contract_path(expr, shapes)
     final_idx = expr.split("->")[1]
     expr2, args, size_map = remove_size1(expr, *args, extra=extra)
     final_shape = [size_map[i] for i in final_idx]
@@ -87,7 +87,7 @@ def build_amp2s(dg):
             a = tf.reshape(i, [-1, i.shape[1]] + [1] * (len(j[0].shape) - 1))
             ret.append(tf.reduce_sum(a * tf.stack(j, axis=1), axis=1))
         # print(ret)
-        amp = tf.reduce_sum(ret, axis=0)
+        amp = tf.add_n(ret)
         amp2s = tf.math.real(amp * tf.math.conj(amp))
         return tf.reduce_sum(amp2s, list(range(1, len(amp2s.shape))))
 
@@ -135,7 +135,7 @@ def cached_amp(dg, data, matrix_method=build_angle_amp_matrix):
             a = tf.reshape(i, [n_data, -1] + [1] * (len(j[0].shape) - 1))
             ret.append(tf.reduce_sum(a * tf.stack(j, axis=1), axis=1))
         # print(ret)
-        amp = tf.reduce_sum(ret, axis=0)
+        amp = tf.add_n(ret)
         return amp
 
     return _amp
@@ -775,6 +775,17 @@ class DecayChain(object):
                 return i
         raise ValueError("Not found particle {} decay".format(p))
 
+    @simple_cache_fun
+    def topo_order(self):
+        """
+        Decays in topological order, the decay of a particle always comes
+        after the decay which produces it.
+        E.g. [r->cd,a->rb] => [a->rb,r->cd]
+
+        :return: List of decays
+        """
+        return [dec for _, dec in self.depth_first()]
+
     def depth_first(self, node_first=True):
         """
         depth first travel for decay
@@ -899,6 +910,7 @@ class DecayGroup(object):
             raise NotImplementedError
         return self.get_chain_from_particle(names)
 
+    @functools.lru_cache()
     def topology_structure(self, identical=False, standard=True):
         """
 
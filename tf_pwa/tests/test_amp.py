@@ -145,6 +145,37 @@ def test_flatte():
     assert b.numpy().real == 0
 
 
+def test_flatte_jit():
+    m = np.linspace(2.5, 4.0, 10)
+    kwargs = {
+        "mass": 3.6,
+        "mass_list": [[1.0, 1.0], [1.5, 2.0]],
+        "g_0": 0.3,
+        "g_1": 0.2,
+    }
+    a = get_particle("flatte_a", model="FlatteGen", l_list=[0, 1], **kwargs)
+    b = get_particle(
+        "flatte_b",
+        model="FlatteGen",
+        l_list=[0, 1],
+        jit_compile=True,
+        **kwargs,
+    )
+    a.init_params()
+    b.init_params()
+    assert np.allclose(a(m).numpy(), b(m).numpy())
+
+
+def test_flatte_momentum():
+    from tf_pwa.amp.flatte import cal_monentum
+
+    m = np.array([1.5, 2.5, 3.5])
+    p2 = (m**2 - 3.5**2) * (m**2 - 0.5**2) / 4 / m**2
+    q = cal_monentum(m, 2.0, 1.5).numpy()
+    assert np.allclose(q.real, np.where(p2 > 0, np.sqrt(np.abs(p2)), 0))
+    assert np.allclose(q.imag, np.where(p2 > 0, 0, np.sqrt(np.abs(p2))))
+
+
 def test_gs():
     a = get_particle("gs", J=1, P=-1, model="GS_rho", mass=3.6, width=0.01)
     b = [get_particle(i, J=0, P=-1) for i in "ac"]
@@ -452,3 +483,77 @@ def test_split_ls2():
     data = cal_angle_from_momentum(p, dg)
     amp1 = amp(data)
     a(np.array([5.9, 6.0, 6.1]))
+
+
+def test_bprime_coeff():
+    from tf_pwa.breit_wigner import Bprime_polynomial, get_bprime_coeff
+
+    assert get_bprime_coeff(5) == [1, 15, 315, 6300, 99225, 893025]
+    assert np.allclose(
+        Bprime_polynomial(7, np.array([0.5])),
+        np.polyval([float(i) for i in get_bprime_coeff(7)], 0.5),
+    )
+
+
+def test_delta_D_trans():
+    from tf_pwa.dfun import delta_D_index, delta_D_trans
+
+    la, lb, lc = [-1, 0, 1], [-0.5, 0.5], [-1.5, -0.5, 0.5, 1.5]
+    s = delta_D_trans(1, la, lb, lc)
+    assert s.shape == (3, 3, 3, 2, 4)
+    assert np.all(
+        np.sum(s, axis=(0, 1)) == (np.abs(np.subtract.outer(lb, lc)) <= 1)
+    )
+    idx = np.reshape(delta_D_index(1, la, lb, lc), (3, 2, 4))
+    assert idx[2, 1, 2] == (1 + 1) * 3 + (0.5 - 0.5) + 1
+    assert s[2, 1, 2, 1, 2] == 1.0
+    assert idx[0, 0, 3] == 9
+
+
+def test_small_d_weight():
+    from tf_pwa.dfun import small_d_matrix, small_d_weight
+
+    assert np.all(small_d_weight(6)[0] == np.eye(7))
+    theta = np.array([0.3, 1.2])
+    d = small_d_matrix(theta, 2).numpy()
+    c, s = np.cos(theta), np.sin(theta)
+    assert np.allclose(d[:, 1, 1], c)
+    assert np.allclose(d[:, 0, 0], (1 + c) / 2)
+    assert np.allclose(d[:, 0, 1], s / np.sqrt(2))
+    assert np.allclose(d[:, 2, 0], (1 - c) / 2)
+    d32 = tf.function(small_d_matrix)(theta.astype(np.float32), 2)
+    assert d32.dtype == tf.float32
+    assert np.allclose(d32.numpy(), d, atol=1e-6)
+
+
+def test_D_matrix_cache():
+    import gc
+
+    from tf_pwa.dfun import _D_matrix_cache, get_D_matrix_for_angle
+
+    x = [tf.constant(np.random.random(5)) for i in range(3)]
+    angle = dict(zip(["alpha", "beta", "gamma"], x))
+    d = get_D_matrix_for_angle(angle, 2)
+    assert get_D_matrix_for_angle(angle, 2) is d
+    assert get_D_matrix_for_angle(angle, 2, cached=False) is not d
+    assert get_D_matrix_for_angle(dict(angle), 2) is d
+    assert sorted(angle) == ["alpha", "beta", "gamma"]
+    f = tf.function(lambda: get_D_matrix_for_angle(angle, 4))
+    assert np.allclose(f(), get_D_matrix_for_angle(angle, 4))
+    n = len(_D_matrix_cache)
+    del x, angle, f
+    gc.collect()
+    assert len(_D_matrix_cache) == n - 2
+
+
+def test_cg_trans():
+    a = get_particle("cg_a", J=1, P=-1)
+    b = get_particle("cg_b", J=1, P=-1)
+    c = get_particle("cg_c", J=0, P=-1)
+    dec = get_decay(a, [b, c])
+    cg = dec.get_cg_trans("complex128")
+    assert cg is dec.get_cg_trans(tf.complex128)
+    assert cg.shape == (len(dec.get_ls_list()), 3, 1)
+    assert np.allclose(cg, np.reshape(dec.get_cg_matrix(), cg.shape))
+    dec.set_ls(dec.get_ls_list()[:1])
+    assert dec.get_cg_trans("complex128").shape == (1, 3, 1)
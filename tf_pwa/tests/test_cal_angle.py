@@ -38,3 +38,133 @@ def test_process():
     data.savetxt("cal_angle_file.txt", ["C", "D"])
     data.savetxt("cal_angle_file.txt")
     hist = data.mass_hist("(C, D)")
+
+
+def test_helicity_angle_chains():
+    from tf_pwa.phasespace import PhaseSpaceGenerator
+
+    a, b, c, d, e = [BaseParticle(i) for i in "ABCDE"]
+    decs = DecayGroup(DecayChain.from_particles(a, [b, c, d, e]))
+    p = PhaseSpaceGenerator(5.0, [1.0, 0.5, 0.3, 0.2]).generate(10)
+    data = struct_momentum(dict(zip([b, c, d, e], p)))
+    chains = decs.topology_structure()
+    for i in chains:
+        data = add_mass(infer_momentum(data, i))
+    ret = cal_helicity_angle_chains(data, chains)
+    assert list(ret.keys()) == list(chains)
+    for i in chains:
+        ret_i = cal_helicity_angle(data, i)
+        for dec in i:
+            for j in dec.outs:
+                for k in ["alpha", "beta", "gamma"]:
+                    assert np.allclose(
+                        ret[i][dec][j]["ang"][k], ret_i[dec][j]["ang"][k]
+                    )
+            assert np.allclose(
+                ret[i]["r_matrix"][j]["x"], ret_i["r_matrix"][j]["x"]
+            )
+
+
+def test_getp():
+    m0 = np.linspace(1.0, 3.0, 11)
+    p_np = Getp(m0, 0.5, 0.6)
+    p_tf = Getp(tf.constant(m0), 0.5, 0.6)
+    assert isinstance(p_np, np.ndarray)
+    assert np.allclose(p_np, p_tf.numpy())
+    assert np.all(p_np[m0 < 1.1] == 0)
+
+
+def test_boost_matrix():
+    p = np.array([[3.0, 0.2, 0.3, 0.4], [2.0, 0.0, 0.0, 0.0]])
+    v = np.array([[1.0, 0.1, -0.2, 0.3], [1.5, 0.5, 0.2, -0.3]])
+    m = LorentzVector.boost_matrix(p).numpy()
+    assert m.shape == (2, 4, 4)
+    assert np.allclose(m[1], np.eye(4))
+    v2 = LorentzVector.boost(v, LorentzVector.boost_vector(p))
+    assert np.allclose(np.einsum("...ij,...j->...i", m, v), v2)
+    assert np.allclose(LorentzVector.M(v2), LorentzVector.M(v))
+
+
+def test_boost_grad_at_rest():
+    p = tf.Variable([[2.0, 0.0, 0.0, 0.0]], dtype="float64")
+    v = tf.constant([[1.0, 0.1, -0.2, 0.3]], dtype="float64")
+    with tf.GradientTape() as tape:
+        y = tf.reduce_sum(LorentzVector.rest_vector(p, v))
+    g = tape.gradient(y, p).numpy()
+    eps = 1e-6
+    g_num = []
+    for i in range(4):
+        dp = np.eye(4)[i] * eps
+        y1 = LorentzVector.rest_vector(p + dp, v)
+        y2 = LorentzVector.rest_vector(p - dp, v)
+        g_num.append(np.sum(y1 - y2) / 2 / eps)
+    assert np.allclose(g[0], g_num)
+
+
+def test_lorentz_M2():
+    from tf_pwa.angle import _lorentz_metric
+
+    _lorentz_metric.cache_clear()
+    p = np.array([[3.0, 1.0, 1.0, 1.0], [2.0, 0.0, 0.0, 1.0]])
+    f = tf.function(LorentzVector.M2)
+    assert np.allclose(f(tf.constant(p)), [6.0, 3.0])
+    assert np.allclose(LorentzVector.M2(p), [6.0, 3.0])
+    assert np.allclose(LorentzVector.M2(p[0]), 6.0)
+    assert np.allclose(LorentzVector.M2(np.stack([p, p])), [[6.0, 3.0]] * 2)
+
+
+def test_cal_angle_tf_function():
+    from tf_pwa.phasespace import PhaseSpaceGenerator
+
+    a, b, c, d = [BaseParticle(i) for i in "ABCD"]
+    decs = DecayGroup(DecayChain.from_particles(a, [b, c, d]))
+    p = PhaseSpaceGenerator(5.0, [1.0, 0.5, 0.3]).generate(100)
+    p = dict(zip([b, c, d], p))
+    ref = flatten_dict_data(data_to_numpy(cal_angle_from_momentum(p, decs)))
+    for _ in range(2):
+        data = cal_angle_from_momentum(p, decs, use_tf_function=True)
+        assert isinstance(data, CalAngleData)
+        data = flatten_dict_data(data_to_numpy(data))
+        assert data.keys() == ref.keys()
+        for k, v in ref.items():
+            # alpha and gamma are degenerate for aligned angle with beta=0
+            if not k.endswith(("aligned_angle/alpha", "aligned_angle/gamma")):
+                assert np.allclose(data[k], v)
+
+
+def test_cal_angle_float32():
+    from tf_pwa.phasespace import PhaseSpaceGenerator
+
+    a, b, c, d = [BaseParticle(i) for i in "ABCD"]
+    decs = DecayGroup(DecayChain.from_particles(a, [b, c, d]))
+    p = PhaseSpaceGenerator(5.0, [1.0, 0.5, 0.3]).generate(100)
+    p = dict(zip([b, c, d], p))
+    ref = flatten_dict_data(data_to_numpy(cal_angle_from_momentum(p, decs)))
+    for use_tf_function in [False, True]:
+        data = cal_angle_from_momentum(
+            p, decs, dtype="float32", use_tf_function=use_tf_function
+        )
+        data = flatten_dict_data(data_to_numpy(data))
+        for k, v in data.items():
+            assert v.dtype == np.float32
+            if k.endswith("/m"):
+                assert np.allclose(v, ref[k], rtol=1e-5)
+
+
+def test_three_outs_decay():
+    from tf_pwa.phasespace import PhaseSpaceGenerator
+
+    a, b, c, d, e, r = [BaseParticle(i) for i in "ABCDER"]
+    BaseDecay(a, [b, c, r])
+    BaseDecay(r, [d, e])
+    decs = DecayGroup(a.chain_decay())
+    p = PhaseSpaceGenerator(5.0, [1.0, 0.5, 0.3, 0.2]).generate(10)
+    data = cal_angle_from_momentum(dict(zip([b, c, d, e], p)), decs)
+    for chain, chain_data in data["decay"].items():
+        for dec in chain:
+            if len(dec.outs) == 3:
+                ang = chain_data[dec]["ang"]
+                assert set(ang) == {"alpha", "beta", "gamma"}
+                assert "ang" not in chain_data[dec][dec.outs[0]]
+            else:
+                assert "ang" in chain_data[dec][dec.outs[0]]
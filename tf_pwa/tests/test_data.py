@@ -64,6 +64,24 @@ def test_load_dat_file():
     assert np.allclose(dat1["a"], dat2["a"])
     assert np.allclose(dat1["b"], dat2["b"])
     assert np.allclose(dat1["c"], dat2["c"])
+    with write_temp_file(s1 + s2) as fname:
+        with pytest.raises(ValueError):
+            load_dat_file(fname, ["a", "b"], split=[1])
+
+
+def test_load_dat_file_cached():
+    s1 = "5.0 2.0 3.0 3.0\n4.0 2.0 4.0 2.0\n"
+    with write_temp_file(s1) as fname:
+        dat1 = load_dat_file(fname, ["a", "b"])
+        dat2 = load_dat_file(fname, ["a", "b"])
+        assert dat1["a"].base is dat2["a"].base
+        with pytest.raises(ValueError):
+            dat1["a"][0] = 1.0
+        with open(fname, "a") as f:
+            f.write(s1)
+        dat3 = load_dat_file(fname, ["a", "b"])
+    assert dat3["a"].shape == (2, 4)
+    assert np.allclose(dat3["a"][1], dat1["a"][0])
 
 
 def test_save_load():
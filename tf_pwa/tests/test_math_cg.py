@@ -1,4 +1,4 @@
-from tf_pwa.cg import cg_coef, get_cg_coef
+from tf_pwa.cg import cg_coef, get_cg_coef, racah_cg
 from tf_pwa.significance import significance
 
 
@@ -25,3 +25,26 @@ def test_get_cg_coef():
         get_cg_coef(2, 1, -1, 0, 2, -1), cg_coef(2, 1, -1, 0, 2, -1)
     )
     assert close_to(get_cg_coef(2, 1, -1, 1, 2, 0), cg_coef(2, 1, -1, 1, 2, 0))
+
+
+def test_cg_coef_cached():
+    a = cg_coef(2, 1, -1, 1, 2, 0)
+    hits = cg_coef.cache_info().hits
+    assert cg_coef(2, 1, -1, 1, 2, 0) == a
+    assert cg_coef.cache_info().hits == hits + 1
+
+
+def test_racah_cg():
+    from sympy.physics.quantum.cg import CG
+
+    for args in [
+        (1, 1, 1, 0, 2, 1),
+        (2, 1, -1, 1, 2, 0),
+        (1.5, 0.5, 0.5, -0.5, 1, 0),
+        (3, 2.5, -2, 1.5, 1.5, -0.5),
+        (2, 2, 1, -1, 3, 0),
+        (1, 1, 1, 1, 1, 2),
+    ]:
+        j1, j2, m1, m2, j, m = args
+        ref = float(CG(j1, m1, j2, m2, j, m).doit().evalf())
+        assert close_to(racah_cg(*args), ref, 1e-12)
@@ -119,3 +119,23 @@ def test_depth_fisrt():
             assert dec.core in used_node
             for j in dec.outs:
                 used_node.append(j)
+
+
+def test_topo_order():
+    decs = DecayChain.from_particles("a", ["B", "C", "D", "E"])
+    for de in decs:
+        de = DecayChain(de.chain[::-1])
+        order = de.topo_order()
+        assert len(order) == len(de.chain)
+        assert order is de.topo_order()
+        used_node = [de.top]
+        for dec in order:
+            assert dec.core in used_node
+            used_node += dec.outs
+
+
+def test_topology_structure_cached():
+    decs = DecayGroup(DecayChain.from_particles("A", ["B", "C", "D"]))
+    struct = decs.topology_structure()
+    assert struct is decs.topology_structure()
+    assert len(struct) == 3
@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
-import copy
+import multiprocessing
 import os.path
+import pickle
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pprint import pprint
 
+import numpy as np
 import yaml
 
 from tf_pwa.config_loader import ConfigLoader
 from tf_pwa.significance import significance
+from tf_pwa.tensorflow_wrapper import tf
 
 this_dir = os.path.dirname(__file__)
 sys.path.insert(0, this_dir + "/..")
@@ -25,32 +29,70 @@ def single_fit(config_dict, data, phsp, bg):
     return fit_result.min_nll, fit_result.ndf
 
 
-def multi_fit(config, data, phsp, bg, num=5):
-    nll, ndf = single_fit(config, data, phsp, bg)
-    for i in range(num - 1):
-        nll_i, ndf_i = single_fit(config, data, phsp, bg)
-        assert ndf_i == ndf
-        if nll > nll_i:
-            nll = nll_i
+def _init_worker(n_threads=None):
+    # fits in worker processes use CPU only,
+    # so that they do not compete for the GPU memory.
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    tf.config.set_visible_devices([], "GPU")
+    # share the cores between workers, instead of a full thread pool each
+    if n_threads is not None:
+        tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(n_threads)
+    # different random initial parameters in each worker process
+    seed = os.getpid()
+    np.random.seed(seed)
+    tf.random.set_seed(seed)
+
+
+def _worker_threads(processes):
+    return max(1, (os.cpu_count() or 1) // processes)
+
+
+def _single_fit(args):
+    return single_fit(*args)
+
+
+def multi_fit(config, data, phsp, bg, num=5, processes=None):
+    if processes is None:
+        processes = min(num, os.cpu_count() or 1)
+    args = [(config, data, phsp, bg)] * num
+    if processes > 1:
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(
+            processes,
+            initializer=_init_worker,
+            initargs=(_worker_threads(processes),),
+        ) as pool:
+            results = pool.map(_single_fit, args)
+    else:
+        results = [_single_fit(i) for i in args]
+    ndf = results[0][1]
+    assert all(ndf_i == ndf for _, ndf_i in results)
+    nll = min(nll_i for nll_i, _ in results)
     return nll, ndf
 
 
+def _veto_list(v, res):
+    if isinstance(v, list) and res in v:
+        return [i for i in v if i != res]
+    return v
+
+
 def veto_resonance(config, res):
-    config = copy.deepcopy(config)
-    for k, v in config["particle"].items():
-        if isinstance(v, list):
-            if res in v:
-                config["particle"][k].remove(res)
-    if res in config["decay"]:
-        config["decay"].remove(res)
-    for k, v in config["decay"].items():
-        # if res in v:
-        #     decay[k].remove(res)
-        for j in v:
-            if isinstance(j, list):
-                if res in j:
-                    j.remove(res)
-    return config
+    # only the lists contain res are copied, others are shared with config
+    particle = {k: _veto_list(v, res) for k, v in config["particle"].items()}
+    decay = {
+        k: [_veto_list(j, res) for j in v]
+        for k, v in config["decay"].items()
+        if k != res
+    }
+    return {**config, "particle": particle, "decay": decay}
+
+
+def _run_veto(config, data, phsp, bg):
+    # top-level so that it can be pickled and sent to worker processes,
+    # already in a worker, so the restarts run serially
+    return multi_fit(config, data, phsp, bg, processes=1)
 
 
 def cached_data(config_dict):
@@ -59,13 +101,16 @@ def cached_data(config_dict):
     return data, phsp, bg
 
 
-def cal_significance(config_name, res, model="-"):
+def cal_significance(config_name, res, model="-", processes=None):
     with open(config_name) as f:
         config = yaml.safe_load(f)
     data, phsp, bg = cached_data(config)
 
+    # loads from the pickled buffer is much faster than deepcopy
+    config_buffer = pickle.dumps(config)
+
     def get_config(extra=[]):
-        base_conf = copy.deepcopy(config)
+        base_conf = pickle.loads(config_buffer)
         if model == "+":
             veto_res = res.copy()
             for i in extra:
@@ -83,16 +128,34 @@ def cal_significance(config_name, res, model="-"):
     ndfs = {"base": ndf}
     print("nll: {}, ndf: {}".format(nll, ndf))
     signi = {}
-    for i in res:
-        print("\ncalculate significance for {}\n".format(i))
-        config_i = get_config([i])
-        nll_i, ndf_i = multi_fit(config_i, data, phsp, bg)
-        nlls[i] = nll_i
-        ndfs[i] = ndf_i
-        signi[i] = significance(nll, nll_i, abs(ndf - ndf_i))
-        print(
-            "nll: {}, ndf: {}, significane: {}".format(nll_i, ndf_i, signi[i])
-        )
+    if processes is None:
+        processes = min(len(res), os.cpu_count() or 1)
+    processes = max(processes, 1)
+    # fits of different resonances are independent
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(_worker_threads(processes),),
+    ) as executor:
+        futures = {}
+        for i in res:
+            print("\ncalculate significance for {}\n".format(i))
+            config_i = get_config([i])
+            fut = executor.submit(_run_veto, config_i, data, phsp, bg)
+            futures[fut] = i
+        for fut in as_completed(futures):
+            i = futures[fut]
+            nll_i, ndf_i = fut.result()
+            nlls[i] = nll_i
+            ndfs[i] = ndf_i
+            signi[i] = significance(nll, nll_i, abs(ndf - ndf_i))
+            print(
+                "{}: nll: {}, ndf: {}, significane: {}".format(
+                    i, nll_i, ndf_i, signi[i]
+                )
+            )
+    signi = {i: signi[i] for i in res}
     return signi, nlls, ndfs
 
 
@@ -113,8 +176,13 @@ def main():
 
     parser = argparse.ArgumentParser(description="calculate significance")
     parser.add_argument("--config", default="config.yml", dest="config")
+    parser.add_argument(
+        "--processes", default=None, type=int, dest="processes"
+    )
     results = parser.parse_args()
-    signi, nlls, ndfs = cal_significance(results.config, res, model="+")
+    signi, nlls, ndfs = cal_significance(
+        results.config, res, model="+", processes=results.processes
+    )
     print("base", nlls["base"], ndfs["base"])
     print("particle\tsignificance\tnll\tndf")
     for i in signi: